@@ -1,6 +1,5 @@
 
 import argparse
-import typing
 
 from . import types
 from . import blp_mcp_server
@@ -10,6 +9,7 @@ def parse_args():
   parser.add_argument("--sse", action="store_true", help="Run an sse server instead of stdio")
   parser.add_argument("--host", type=str, default=None)
   parser.add_argument("--port", type=int, default=None)
+  parser.add_argument("--no-rate-limit", action="store_true", help="Disable the 10,000 hits/day Bloomberg usage cap")
 
   args = parser.parse_args()
   is_http = args.sse or args.host != None or args.port != None
@@ -18,7 +18,7 @@ def parse_args():
   transport = types.Transport.STREAMABLE_HTTP if is_http else types.Transport.STDIO
   host = args.host if args.host != None else "127.0.0.1"
   port = args.port if args.port != None else 8000
-  return types.StartupArgs(transport=transport, host=host, port=port)
+  return types.StartupArgs(transport=transport, host=host, port=port, enable_rate_limit=not args.no_rate_limit)
 
 def main() -> None:
   args = parse_args()
@@ -0,0 +1,77 @@
+"""
+Direct blpapi request paths for the highest-volume tools, bypassing xbbg's per-call pipeline.
+Output matches xbbg's default (wide) pandas shape so callers can use either path.
+"""
+
+import typing
+
+import blpapi
+import pandas as pd
+
+REFDATA_SERVICE = "//blp/refdata"
+# Max wait for each event while draining a response
+EVENT_TIMEOUT_MS = 30_000
+
+_REFERENCE_DATA_RESPONSE = blpapi.Name("ReferenceDataResponse")
+_RESPONSE_ERROR = blpapi.Name("responseError")
+_SECURITY_DATA = blpapi.Name("securityData")
+_SECURITY = blpapi.Name("security")
+_SECURITY_ERROR = blpapi.Name("securityError")
+_FIELD_DATA = blpapi.Name("fieldData")
+_REQUEST_FAILURE = blpapi.Name("RequestFailure")
+_REASON = blpapi.Name("reason")
+
+
+def _column_name(field: str) -> str:
+  # Same standardization xbbg applies to bdp columns
+  return field.lower().replace(" ", "_").replace("-", "_")
+
+
+def ref_data(session: blpapi.Session, tickers: typing.List[str], flds: typing.List[str]) -> pd.DataFrame:
+  """bdp equivalent: one ReferenceDataRequest on an already started session.
+
+  Returns a DataFrame indexed by ticker (request order) with one lower-cased column per field.
+  Tickers with a security error are omitted and fields Bloomberg does not return are left empty, as with xbbg."""
+  request = session.getService(REFDATA_SERVICE).createRequest("ReferenceDataRequest")
+  for ticker in tickers:
+    request.append("securities", ticker)
+  for fld in flds:
+    request.append("fields", fld)
+
+  # A private queue per request: a late response to an earlier, timed-out request can never end this one
+  queue = blpapi.EventQueue()
+  cid = session.sendRequest(request, eventQueue=queue)
+  rows: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+  done = False
+  while not done:
+    event = queue.nextEvent(EVENT_TIMEOUT_MS)
+    event_type = event.eventType()
+    if event_type == blpapi.Event.TIMEOUT:
+      session.cancel(cid)
+      raise TimeoutError(f"No ReferenceDataResponse within {EVENT_TIMEOUT_MS} ms")
+    for msg in event:
+      if cid not in msg.correlationIds():
+        continue
+      if event_type == blpapi.Event.REQUEST_STATUS and msg.messageType() == _REQUEST_FAILURE:
+        # RequestFailure (service down, disconnect, rejection): no response will follow for this cid
+        reason = msg.getElement(_REASON) if msg.hasElement(_REASON) else msg
+        raise RuntimeError(f"ReferenceDataRequest failed: {reason}")
+      done = done or event_type == blpapi.Event.RESPONSE
+      if msg.messageType() != _REFERENCE_DATA_RESPONSE:
+        continue
+      if msg.hasElement(_RESPONSE_ERROR):
+        raise RuntimeError(f"ReferenceDataRequest failed: {msg.getElement(_RESPONSE_ERROR)}")
+      for security in msg.getElement(_SECURITY_DATA).values():
+        if security.hasElement(_SECURITY_ERROR):
+          continue
+        row = rows.setdefault(security.getElementAsString(_SECURITY), {})
+        for field in security.getElement(_FIELD_DATA).elements():
+          row[_column_name(str(field.name()))] = field.toPy()
+
+  index = [t for t in dict.fromkeys(tickers) if t in rows]
+  columns = [c for c in dict.fromkeys(_column_name(f) for f in flds) if any(c in rows[t] for t in index)]
+  return pd.DataFrame.from_records(
+    [[rows[t].get(c) for c in columns] for t in index],
+    index=pd.Index(index, name="ticker"),
+    columns=columns,
+  )
@@ -1,15 +1,25 @@
+import asyncio
+import atexit
+import concurrent.futures
+import functools
+import importlib
+import sys
 import typing
+import warnings
 
 import blpapi
 import blpapi.version
+import cachetools
+import numpy as np
+import orjson
 import pandas as pd
 from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.tools import Tool
 from mcp.server.fastmcp.utilities.logging import get_logger
 from mcp.server.transport_security import TransportSecuritySettings
-from starlette.requests import Request
-from starlette.routing import Route
 from xbbg import blp
 
+from . import _blp_fast
 from . import types
 from .rate_limit_counter import DailyRateLimitCounter
 
@@ -18,17 +28,188 @@ RATE_LIMIT_MSG = (
   "Daily limit of 10,000 Bloomberg hits has been reached (America/New_York day). "
   "No further BLP requests can be made until the next day. Try again tomorrow."
 )
+RATE_LIMIT_ESTIMATE_MSG = (
+  "This request needs about {needed:,} Bloomberg hits but only {remaining:,} of the daily "
+  "10,000 remain (America/New_York day). Request fewer tickers, fields or dates, or try again tomorrow."
+)
+
+# Blocking xbbg/blpapi calls run here instead of on the event loop, so one slow request does not
+# stall SSE streams or other tool calls. xbbg shares a single blpapi Session across calls and
+# Sessions are not safe for concurrent request submission, so keep one worker unless that changes.
+BLP_POOL_WORKERS = 1
+_BLP_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=BLP_POOL_WORKERS, thread_name_prefix="blp")
+
+
+# Long-lived blpapi Session shared by every tool call (set in serve()). Requests on it are
+# serialized by the single-worker BLP pool.
+_SESSION: typing.Optional[blpapi.Session] = None
+
+
+def _start_blp_session() -> blpapi.Session:
+  """Start one blpapi Session, open //blp/refdata and register it as xbbg's default session."""
+  opts = blpapi.SessionOptions()
+  opts.setAutoRestartOnDisconnection(True)
+  session = blpapi.Session(opts)
+  # connect(sess=...) starts the session; xbbg then reuses it (and its opened services) for every call.
+  # xbbg 0.12 flags connect() as removed in 1.0, which no longer accepts an external session; pyproject pins <1.0.
+  with warnings.catch_warnings():
+    warnings.simplefilter("ignore", FutureWarning)
+    blp.connect(sess=session)
+  if not session.openService(_blp_fast.REFDATA_SERVICE):
+    session.stop()
+    raise ConnectionError(f"Could not open {_blp_fast.REFDATA_SERVICE}")
+  return session
+
+
+# Modules xbbg imports inside each call (and pyarrow behind them). Importing them at startup keeps
+# that cost off the first user request; missing ones are skipped since the layout varies by version.
+_XBBG_LAZY_MODULES = (
+  "pyarrow",
+  "xbbg.core.domain.context",
+  "xbbg.core.pipeline_core",
+  "xbbg.core.pipeline_factories",
+  "xbbg.core.request_builder",
+  "xbbg.io.convert",
+)
+
+
+def _preload_xbbg() -> None:
+  for module in _XBBG_LAZY_MODULES:
+    try:
+      importlib.import_module(module)
+    except ImportError:
+      pass
+
+
+def _in_pool(call_blp: typing.Callable[[], typing.Any]) -> typing.Awaitable[typing.Any]:
+  """Run a blocking xbbg call on the BLP pool."""
+  return asyncio.get_running_loop().run_in_executor(_BLP_POOL, call_blp)
+
+
+# bdp calls arriving within this window are merged into a single Bloomberg request.
+COALESCE_WINDOW_S = 0.02
+
+
+class _Coalescer:
+  """Merges concurrent bdp(tickers, flds) calls with the same field list into one request on the union of tickers.
+
+  Only equal field lists are merged: Bloomberg bills every ticker x field cell of the merged request, and with
+  shared fields that grid is never larger than the callers' own slices, which is what each of them records.
+  Each caller gets back only the rows it asked for. An exception from a merged request is raised to every
+  caller in that group."""
+
+  def __init__(self, fetch: typing.Callable[[typing.List[str], typing.List[str]], typing.Any], window: float = COALESCE_WINDOW_S) -> None:
+    self._fetch = fetch
+    self._window = window
+    self._queue: asyncio.Queue[tuple[typing.List[str], typing.List[str], asyncio.Future]] = asyncio.Queue()
+    self._drain_task: asyncio.Task | None = None
+
+  async def submit(self, tickers: typing.List[str], flds: typing.List[str]) -> typing.Any:
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    self._queue.put_nowait((tickers, flds, future))
+    if self._drain_task is None or self._drain_task.done():
+      self._drain_task = loop.create_task(self._drain())
+    return await future
+
+  async def _drain(self) -> None:
+    while not self._queue.empty():
+      await asyncio.sleep(self._window)
+      batch = []
+      while not self._queue.empty():
+        batch.append(self._queue.get_nowait())
+      try:
+        groups: typing.Dict[tuple[str, ...], list] = {}
+        for item in batch:
+          groups.setdefault(tuple(item[1]), []).append(item)
+        for group in groups.values():
+          await self._run_batch(group)
+      except Exception as e:
+        # Never leave a caller waiting on a future nobody will complete
+        for _, _, future in batch:
+          if not future.done():
+            future.set_exception(e)
+
+  async def _run_batch(self, batch: typing.List[tuple[typing.List[str], typing.List[str], asyncio.Future]]) -> None:
+    tickers = list(dict.fromkeys(t for ticker_list, _, _ in batch for t in ticker_list))
+    flds = batch[0][1]
+    try:
+      out = await _in_pool(functools.partial(self._fetch, tickers, flds))
+    except Exception as e:
+      for _, _, future in batch:
+        if not future.done():
+          future.set_exception(e)
+      return
+    for ticker_list, fld_list, future in batch:
+      if future.done():
+        continue
+      try:
+        future.set_result(out if len(batch) == 1 else _select(out, ticker_list, fld_list))
+      except Exception as e:
+        future.set_exception(e)
+
+
+def _select(df: typing.Any, tickers: typing.List[str], flds: typing.List[str]) -> typing.Any:
+  """Rows for tickers and columns for flds out of a merged bdp DataFrame (columns named as xbbg standardizes fields)."""
+  if not isinstance(df, pd.DataFrame):
+    return df
+  wanted = {_blp_fast._column_name(f) for f in flds}
+  rows = df.index.isin(tickers)
+  cols = [c for c in df.columns if _blp_fast._column_name(str(c)) in wanted]
+  return df.loc[rows, cols]
+
+
+_DataFrame = pd.DataFrame
 
 
 def _count_dataframe_cells(value: typing.Any) -> int:
   """Number of data cells (values) in a DataFrame; 0 for non-DataFrame."""
-  if value is None:
-    return 0
-  if isinstance(value, pd.DataFrame):
+  # xbbg returns plain DataFrames, so the exact type check almost always decides
+  if type(value) is _DataFrame or isinstance(value, _DataFrame):
     return int(value.size)
   return 0
 
 
+# DataFrame results are returned as one split-orient JSON text block. FastMCP converts a tool's return
+# value to content only after the call completes, so a result cannot be streamed to the client in parts.
+_ORJSON_OPTS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _orjson_default(value: typing.Any) -> typing.Any:
+  # pd.NaT / pd.NA (e.g. in index labels) would otherwise be written as the strings "NaT" / "<NA>"
+  if pd.api.types.is_scalar(value) and pd.isna(value):
+    return None
+  # pd.Timestamp and other datetime subclasses are not handled natively by orjson
+  isoformat = getattr(value, "isoformat", None)
+  return isoformat() if isoformat is not None else str(value)
+
+
+def _df_to_payload(df: pd.DataFrame) -> str:
+  """Serialize a DataFrame as {"columns", "index", "data"} JSON.
+
+  Missing cells (NaN, NaT, pd.NA) are written as null. MultiIndex labels (e.g. bdh (ticker, field) columns)
+  become arrays."""
+  # orjson writes float NaN as null and numpy int/bool columns cannot hold NA, so only other dtypes
+  # (datetime, object, nullable/Arrow extension) need NaT/NA masked to None
+  dtypes = df.dtypes
+  masked = [i for i, dtype in enumerate(dtypes) if not (isinstance(dtype, np.dtype) and dtype.kind in "fiub")]
+  if not masked and dtypes.nunique() <= 1:
+    # Single numeric dtype (e.g. all-float bdh frames): one array, no object copy
+    values = df.to_numpy()
+  else:
+    # Mixed dtypes go through object so ints are not upcast to float
+    values = df.to_numpy(dtype=object)
+    for i in masked:
+      column = values[:, i]
+      column[pd.isna(column)] = None
+  data = values.tolist()
+  return orjson.dumps(
+    {"columns": df.columns.tolist(), "index": df.index.tolist(), "data": data},
+    default=_orjson_default,
+    option=_ORJSON_OPTS,
+  ).decode()
+
+
 SSE_PATH = "/sse"
 MCP_PATH = "/mcp"
 
@@ -37,30 +218,225 @@ def _patch_sse_accept_header():
     """Allow SSE GET connections from clients that don't send Accept: text/event-stream (e.g. Claude).
     Patches MCP transport so we inject the header instead of returning 406."""
     from mcp.server import streamable_http
+    from starlette.requests import Request
 
     transport_class = streamable_http.StreamableHTTPServerTransport
     _original_handle_get = transport_class._handle_get_request
 
     async def _handle_get_request_no_accept_check(self, request: Request, send):
+        # Rewrite the header list in place: request.headers (if already read) wraps this same list
         scope = request.scope
-        headers = list(scope.get("headers", []))
-        headers = [(k, v) for k, v in headers if k.lower() != b"accept"]
+        headers = scope.get("headers")
+        if not isinstance(headers, list):
+            headers = scope["headers"] = list(headers or [])
+        headers[:] = [(k, v) for k, v in headers if k.lower() != b"accept"]
         headers.append((b"accept", b"text/event-stream"))
-        new_scope = {**scope, "headers": headers}
-        new_request = Request(new_scope, request.receive)
-        await _original_handle_get(self, new_request, send)
+        await _original_handle_get(self, request, send)
 
     transport_class._handle_get_request = _handle_get_request_no_accept_check
 
 
 def _add_sse_route(app, mcp_path: str, sse_path: str):
     """Add a separate /sse route that uses the same handler as the MCP path."""
-    for i, route in enumerate(app.router.routes):
-        path = getattr(route, "path", None)
-        if path == mcp_path:
-            app.router.routes.insert(i, Route(sse_path, endpoint=route.endpoint))
-            return
-    raise RuntimeError(f"Could not find route for {mcp_path} to clone for {sse_path}")
+    from starlette.routing import Route
+
+    # Clone FastMCP's own route rather than building one from its session manager, so any auth
+    # wrapper on the endpoint is kept. FastMCP (1.26) keeps no reference to that endpoint, so it is
+    # looked up once here at startup.
+    routes = app.router.routes
+    i, route = next(
+        ((i, route) for i, route in enumerate(routes) if getattr(route, "path", None) == mcp_path),
+        (None, None),
+    )
+    if route is None:
+        raise RuntimeError(f"Could not find route for {mcp_path} to clone for {sse_path}")
+    # The cloned endpoint is a raw ASGI app, whose route.methods is None (any method); /sse serves only
+    # the GET event stream
+    routes.insert(i, Route(sse_path, endpoint=route.endpoint, methods=["GET"]))
+
+
+# Set by serve(); None when the daily rate limit is disabled.
+_RATE_LIMIT: typing.Optional[DailyRateLimitCounter] = None
+
+# Only plain bdp calls are merged: override kwargs differ per call, and bds/bdh frames
+# cannot be split back per caller without ambiguity.
+def _bdp_no_overrides(tickers: typing.List[str], flds: typing.List[str]) -> typing.Any:
+  # Plain bdp goes straight to blpapi on the persistent session; xbbg handles everything else
+  if _SESSION is not None:
+    return _blp_fast.ref_data(_SESSION, tickers, flds)
+  return blp.bdp(tickers=tickers, flds=flds)
+
+
+_BDP_COALESCER = _Coalescer(_bdp_no_overrides)
+
+
+# Reference data (bdp/bds/beqs) changes slowly: repeated identical calls within the TTL are served
+# from memory and do not count against the daily limit. Historical/intraday tools are not cached.
+RESULT_CACHE_TTL_S = 300
+_RESULT_CACHE: cachetools.TTLCache = cachetools.TTLCache(maxsize=4096, ttl=RESULT_CACHE_TTL_S)
+
+
+def _cache_key(name: str, params: typing.Dict[str, typing.Any]) -> bytes:
+  # kwargs overrides may hold lists/dicts, so key on a canonical JSON encoding
+  return orjson.dumps([name, params], default=str, option=orjson.OPT_SORT_KEYS)
+
+
+_CACHED_TOOLS = frozenset({"bdp", "bds", "beqs"})
+
+# xbbg entry point for each tool
+_BLP_FNS: typing.Dict[str, typing.Callable[..., typing.Any]] = {
+  "bdp": blp.bdp,
+  "bds": blp.bds,
+  "bdh": blp.bdh,
+  "bdib": blp.bdib,
+  "bdtick": blp.bdtick,
+  "earning": blp.earning,
+  "dividend": blp.dividend,
+  "beqs": blp.beqs,
+  "turnover": blp.turnover,
+}
+
+
+def _overrides(kwargs: types.BloombergKWArgs) -> typing.Dict[str, typing.Any]:
+  """Extra keyword arguments for the xbbg call: kwargs is only passed through when given."""
+  return {} if kwargs is None else {"kwargs": kwargs}
+
+
+def _approx_days(start_date: typing.Optional[str], end_date: typing.Optional[str]) -> int:
+  """Business days in [start_date, end_date] (at least 1); 1 if either date cannot be parsed."""
+  if start_date is None:
+    return 1
+  try:
+    start = pd.Timestamp(start_date).date()
+    end = pd.Timestamp(end_date or "today").date()
+  except (TypeError, ValueError):
+    return 1
+  return max(1, int(np.busday_count(start, end)) + 1)
+
+
+# Business days per row for bdh periodicity overrides, keyed by xbbg's Per code or Bloomberg's periodicitySelection
+_BUSINESS_DAYS_PER_PERIOD = {
+  "D": 1, "DAILY": 1,
+  "W": 5, "WEEKLY": 5,
+  "M": 21, "MONTHLY": 21,
+  "Q": 63, "QUARTERLY": 63,
+  "S": 126, "SEMI_ANNUALLY": 126,
+  "Y": 252, "YEARLY": 252,
+}
+
+
+def _approx_rows(params: typing.Dict[str, typing.Any]) -> int:
+  """Rows a bdh call returns per ticker and field, scaled down for weekly..yearly periodicity overrides."""
+  days = _approx_days(params["start_date"], params["end_date"])
+  overrides = params.get("kwargs") or {}
+  per = overrides.get("Per", overrides.get("periodicitySelection"))
+  step = _BUSINESS_DAYS_PER_PERIOD.get(str(per).upper(), 1) if per is not None else 1
+  return max(1, -(-days // step))
+
+
+def _estimate_hits(name: str, params: typing.Dict[str, typing.Any]) -> int:
+  """Expected number of cells (hits) a call returns, reserved against the daily limit up front."""
+  if name == "bdp":
+    return max(1, len(params["tickers"]) * len(params["flds"]))
+  if name == "bdh":
+    return max(1, len(params["tickers"]) * len(params["flds"]) * _approx_rows(params))
+  return 1
+
+
+def _call_blp(name: str, params: typing.Dict[str, typing.Any]) -> typing.Awaitable[typing.Any]:
+  if name == "bdp" and "kwargs" not in params:
+    return _BDP_COALESCER.submit(params["tickers"], params["flds"])
+  return _in_pool(functools.partial(_BLP_FNS[name], **params))
+
+
+async def _wrap_blp(name: str, /, **params: typing.Any) -> typing.Any:
+  cache_key = _cache_key(name, params) if name in _CACHED_TOOLS else None
+  if cache_key is not None:
+    cached = _RESULT_CACHE.get(cache_key)
+    if cached is not None:
+      return cached
+  rate_limit = _RATE_LIMIT
+  reserved = 0
+  reserved_on = None
+  if rate_limit is not None:
+    # Check and reserve in one step so concurrent calls cannot overcommit the daily limit
+    reserved = _estimate_hits(name, params)
+    reserved_on = rate_limit.try_reserve(reserved)
+    if reserved_on is None:
+      remaining = rate_limit.remaining()
+      if remaining == 0:
+        return RATE_LIMIT_MSG
+      return RATE_LIMIT_ESTIMATE_MSG.format(needed=reserved, remaining=remaining)
+  try:
+    out = await _call_blp(name, params)
+  except Exception:
+    if rate_limit is not None:
+      rate_limit.adjust(-reserved, reserved_on)
+    raise
+  if rate_limit is not None:
+    # Settle the reservation against the cells actually returned (skipped if the day rolled over meanwhile)
+    rate_limit.adjust(_count_dataframe_cells(out) - reserved, reserved_on)
+  if isinstance(out, _DataFrame):
+    out = _df_to_payload(out)
+    if cache_key is not None:
+      _RESULT_CACHE[cache_key] = out
+  return out
+
+
+async def bdp(tickers:typing.List[str], flds:typing.List[str], kwargs: types.BloombergKWArgs = None) -> typing.Any:
+  return await _wrap_blp("bdp", tickers=tickers, flds=flds, **_overrides(kwargs))
+
+
+async def bds(tickers:typing.List[str], flds:typing.List[str], use_port:bool=False, kwargs:types.BloombergKWArgs=None) -> typing.Any:
+  return await _wrap_blp("bds", tickers=tickers, flds=flds, use_port=use_port, **_overrides(kwargs))
+
+
+async def bdh(tickers:typing.List[str], flds:typing.List[str], start_date:typing.Union[None, str]=None, end_date:str="today", adjust: typing.Union[str, None] = None, kwargs: types.BloombergKWArgs = None) -> typing.Any:
+  return await _wrap_blp("bdh", tickers=tickers, flds=flds, start_date=start_date, end_date=end_date, adjust=adjust, **_overrides(kwargs))
+
+
+async def bdib(ticker:str, dt:str, session:str = "allday", typ:str = "TRADE", kwargs: types.BloombergKWArgs=None) -> typing.Any:
+  return await _wrap_blp("bdib", ticker=ticker, dt=dt, session=session, typ=typ, **_overrides(kwargs))
+
+
+async def bdtick(ticker:str, dt:str, session:str="allday", time_range:typing.Union[None, typing.Tuple[str]]=None, types:typing.Union[None, typing.List[str]]=None, kwargs:types.BloombergKWArgs=None) -> typing.Any:
+  return await _wrap_blp("bdtick", ticker=ticker, dt=dt, session=session, time_range=time_range, types=types, **_overrides(kwargs))
+
+
+async def earning(ticker:str, by:str="Geo", typ:str="Revenue", ccy:typing.Union[None,str]=None, level: typing.Union[None, str]=None, kwargs:types.BloombergKWArgs=None) -> typing.Any:
+  return await _wrap_blp("earning", ticker=ticker, by=by, typ=typ, ccy=ccy, level=level, **_overrides(kwargs))
+
+
+async def dividend(tickers:typing.List[str], typ:str="all", start_date:typing.Union[None,str]=None, end_date:typing.Union[None,str]=None, kwargs:types.BloombergKWArgs=None) -> typing.Any:
+  return await _wrap_blp("dividend", tickers=tickers, typ=typ, start_date=start_date, end_date=end_date, **_overrides(kwargs))
+
+
+async def beqs(screen:str, asof:typing.Union[None,str]=None, typ:str="PRIVATE", group:str="General", kwargs:types.BloombergKWArgs=None) -> typing.Any:
+  return await _wrap_blp("beqs", screen=screen, asof=asof, typ=typ, group=group, **_overrides(kwargs))
+
+
+async def turnover(tickers:typing.List[str], flds:str="Turnover", start_date:typing.Union[None,str]=None, end_date:typing.Union[None,str]=None, ccy:str="USD", factor:float=1e6) -> typing.Any:
+  return await _wrap_blp("turnover", tickers=tickers, flds=flds, start_date=start_date, end_date=end_date, ccy=ccy, factor=factor)
+
+
+# (name, description, handler) for every MCP tool; registered in serve()
+_TOOLS: typing.Tuple[typing.Tuple[str, str, typing.Callable[..., typing.Awaitable[typing.Any]]], ...] = (
+  ("bdp", "Get Bloomberg reference data", bdp),
+  ("bds", "Get Bloomberg block data", bds),
+  ("bdh", "Get Bloomberg historical data", bdh),
+  ("bdib", "Get Bloomberg intraday bar data", bdib),
+  ("bdtick", "Get Bloomberg tick data", bdtick),
+  ("earning", "Get Bloomberg earning exposure by Geo or Products", earning),
+  ("dividend", "Get Bloomberg divident / split history", dividend),
+  ("beqs", "Get Bloomberg equity screening", beqs),
+  ("turnover", "Calculate the adjusted turnover (in millions)", turnover),
+)
+
+
+@functools.cache
+def _build_tools() -> typing.List[Tool]:
+  """Tool objects (with their pydantic argument models) for _TOOLS, built once per process."""
+  return [Tool.from_function(fn, name=name, description=description) for name, description, fn in _TOOLS]
 
 
 def serve(args: types.StartupArgs):
@@ -75,91 +451,29 @@ def serve(args: types.StartupArgs):
     streamable_http_path=MCP_PATH,
     json_response=True,
     transport_security=TransportSecuritySettings(enable_dns_rebinding_protection=False),
+    tools=_build_tools(),
   )
 
   logger = get_logger(__name__)
   logger.info("startup args:" + str(args))
   logger.info("blpapi version:" + blpapi.version()) # type: ignore
 
-  # Single daily rate-limit counter (10k hits/day EST), persisted to var/ratelimit_state.json
-  rate_limit = DailyRateLimitCounter()
-
-  def _wrap_blp(name: str, call_blp: typing.Callable[[], typing.Any]) -> typing.Any:
-    if not rate_limit.can_consume(1):
-      return RATE_LIMIT_MSG
-    try:
-      out = call_blp()
-      n = _count_dataframe_cells(out)
-      if n > 0:
-        rate_limit.record_usage(n)
-      return out
-    except Exception:
-      raise
-
-  @mcp.tool(
-    name="bdp",
-    description="Get Bloomberg reference data"
-  )
-  async def bdp(tickers:typing.List[str], flds:typing.List[str], kwargs: types.BloombergKWArgs = None) -> typing.Any:
-    return _wrap_blp("bdp", lambda: blp.bdp(tickers=tickers, flds=flds) if kwargs is None else blp.bdp(tickers=tickers, flds=flds, kwargs=kwargs))
-
-  @mcp.tool(
-    name="bds",
-    description="Get Bloomberg block data"
-  )
-  async def bds(tickers:typing.List[str], flds:typing.List[str], use_port:bool=False, kwargs:types.BloombergKWArgs=None) -> typing.Any:
-    return _wrap_blp("bds", lambda: blp.bds(tickers=tickers, flds=flds, use_port=use_port) if kwargs is None else blp.bds(tickers=tickers, flds=flds, use_port=use_port, kwargs=kwargs))
-
-  @mcp.tool(
-    name="bdh",
-    description="Get Bloomberg historical data"
-  )
-  async def bdh(tickers:typing.List[str], flds:typing.List[str], start_date:typing.Union[None, str]=None, end_date:str="today", adjust: typing.Union[str, None] = None, kwargs: types.BloombergKWArgs = None) -> typing.Any:
-    return _wrap_blp("bdh", lambda: blp.bdh(tickers=tickers, flds=flds, start_date=start_date, end_date=end_date, adjust=adjust) if kwargs is None else blp.bdh(tickers=tickers, flds=flds, start_date=start_date, end_date=end_date, adjust=adjust, kwargs=kwargs))
-
-  @mcp.tool(
-    name="bdib",
-    description="Get Bloomberg intraday bar data"
-  )
-  async def bdib(ticker:str, dt:str, session:str = "allday", typ:str = "TRADE", kwargs: types.BloombergKWArgs=None) -> typing.Any:
-    return _wrap_blp("bdib", lambda: blp.bdib(ticker=ticker, dt=dt, session=session, typ=typ) if kwargs is None else blp.bdib(ticker=ticker, dt=dt, session=session, typ=typ, kwargs=kwargs))
-
-  @mcp.tool(
-    name="bdtick",
-    description="Get Bloomberg tick data"
-  )
-  async def bdtick(ticker:str, dt:str, session:str="allday", time_range:typing.Union[None, typing.Tuple[str]]=None, types:typing.Union[None, typing.List[str]]=None, kwargs:types.BloombergKWArgs=None) -> typing.Any:
-    return _wrap_blp("bdtick", lambda: blp.bdtick(ticker=ticker, dt=dt, session=session, time_range=time_range, types=types) if kwargs is None else blp.bdtick(ticker=ticker, dt=dt, session=session, time_range=time_range, types=types, kwargs=kwargs))
+  global _SESSION
+  try:
+    _SESSION = _start_blp_session()
+    atexit.register(_SESSION.stop)
+  except (ConnectionError, blpapi.Exception) as e:
+    # BBComm may not be up yet; xbbg then falls back to opening a session on the first call
+    logger.warning("Could not start persistent blpapi session: %s", e)
 
-  @mcp.tool(
-    name="earning",
-    description="Get Bloomberg earning exposure by Geo or Products"
-  )
-  async def earning(ticker:str, by:str="Geo", typ:str="Revenue", ccy:typing.Union[None,str]=None, level: typing.Union[None, str]=None, kwargs:types.BloombergKWArgs=None) -> typing.Any:
-    return _wrap_blp("earning", lambda: blp.earning(ticker=ticker, by=by, typ=typ, ccy=ccy, level=level) if kwargs is None else blp.earning(ticker=ticker, by=by, typ=typ, ccy=ccy, level=level, kwargs=kwargs))
-
-  @mcp.tool(
-    name="dividend",
-    description="Get Bloomberg divident / split history"
-  )
-  async def dividend(tickers:typing.List[str], typ:str="all", start_date:typing.Union[None,str]=None, end_date:typing.Union[None,str]=None, kwargs:types.BloombergKWArgs=None) -> typing.Any:
-    return _wrap_blp("dividend", lambda: blp.dividend(tickers=tickers, typ=typ, start_date=start_date, end_date=end_date) if kwargs is None else blp.dividend(tickers=tickers, typ=typ, start_date=start_date, end_date=end_date, kwargs=kwargs))
+  # Runs on the BLP pool so its worker thread is also up before the first call
+  _BLP_POOL.submit(_preload_xbbg).result()
 
-  @mcp.tool(
-    name="beqs",
-    description="Get Bloomberg equity screening"
-  )
-  async def beqs(screen:str, asof:typing.Union[None,str]=None, typ:str="PRIVATE", group:str="General", kwargs:types.BloombergKWArgs=None) -> typing.Any:
-    return _wrap_blp("beqs", lambda: blp.beqs(screen=screen, asof=asof, typ=typ, group=group) if kwargs is None else blp.beqs(screen=screen, asof=asof, typ=typ, group=group, kwargs=kwargs))
-
-  @mcp.tool(
-    name="turnover",
-    description="Calculate the adjusted turnover (in millions)"
-  )
-  async def turnover(tickers:typing.List[str], flds:str="Turnover", start_date:typing.Union[None,str]=None, end_date:typing.Union[None,str]=None, ccy:str="USD", factor:float=1e6) -> typing.Any:
-    return _wrap_blp("turnover", lambda: blp.turnover(tickers=tickers, flds=flds, start_date=start_date, end_date=end_date, ccy=ccy, factor=factor))
+  # Single daily rate-limit counter (10k hits/day EST), persisted to var/ratelimit_state.json
+  global _RATE_LIMIT
+  _RATE_LIMIT = DailyRateLimitCounter() if args.enable_rate_limit else None
 
-  if args.transport.value == "streamable-http":
+  if args.transport is types.Transport.STREAMABLE_HTTP:
     import anyio
     import uvicorn
 
@@ -167,10 +481,20 @@ def serve(args: types.StartupArgs):
     _add_sse_route(app, MCP_PATH, SSE_PATH)
     logger.info("SSE at %s, MCP at %s", SSE_PATH, MCP_PATH)
 
+    # uvloop + httptools (C event loop and HTTP parser) where available; not supported on Windows
+    fast_io = sys.platform != "win32"
     config = uvicorn.Config(
       app,
       host=args.host,
       port=args.port,
+      http="httptools" if fast_io else "auto",
+      ws="none", # MCP here is plain HTTP + SSE; skip loading a websockets implementation
+      # MCP clients reuse the connection for JSON-RPC POSTs between tool calls. 75 s outlives the 60 s idle
+      # timeout of common proxies (Cloudflare tunnel, ALB), so the proxy closes first and never hits a dead socket.
+      # No limit_concurrency: uvicorn counts idle keep-alive sockets and open SSE streams against it.
+      timeout_keep_alive=75,
+      # Absorb bursts of connects
+      backlog=2048,
       log_level=mcp.settings.log_level.lower(),
     )
 
@@ -178,6 +502,7 @@ def serve(args: types.StartupArgs):
       server = uvicorn.Server(config)
       await server.serve()
 
-    anyio.run(_serve)
+    # uvicorn's loop= setting only applies to uvicorn.run(); here the loop is created by anyio
+    anyio.run(_serve, backend_options={"use_uvloop": fast_io})
   else:
     mcp.run(transport=args.transport.value)
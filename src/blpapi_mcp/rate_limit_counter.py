@@ -1,32 +1,97 @@
 """
 Daily rate-limit counter: 10,000 hits/day (EST/NY), persisted to JSON.
 Single process, thread-safe. Used by BLP MCP to cap Bloomberg API usage.
+
+Usage updates are written behind by a background thread: state is saved every FLUSH_INTERVAL_S
+seconds, early once FLUSH_EVERY_N updates are pending, on day rollover and at interpreter exit.
+The state lock is only held to serialize a snapshot; the file is written outside it, so callers
+never wait on disk I/O. Each save replaces the file atomically (temp file + os.replace), so a
+crash loses at most the usage since the last save and never leaves a torn state file.
 """
 
 from __future__ import annotations
 
-import json
+import atexit
+import collections
+import functools
 import os
+import logging
 import threading
+import time
 import typing
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+import orjson
+
+
+logger = logging.getLogger(__name__)
+
+_UTC = ZoneInfo("UTC")
+_O_DSYNC = getattr(os, "O_DSYNC", 0)
+
+
+def _fsync_dir(path: str) -> None:
+    """Persist a rename into path. Not possible on Windows, where directories cannot be opened."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
 
 def _today_est_str(tz: ZoneInfo, now: datetime) -> str:
-    return now.astimezone(tz).strftime("%Y-%m-%d")
+    # Only runs on a date-cache miss (once a minute). The zone offset must come from astimezone: ZoneInfo.utcoffset()
+    # reads a UTC datetime as local wall time and is off by an hour around DST transitions.
+    return now.astimezone(tz).date().isoformat()
 
 
+@functools.lru_cache(maxsize=2)
 def _yesterday_est_str(today_str: str) -> str:
-    dt = datetime.strptime(today_str, "%Y-%m-%d")
-    return (dt - timedelta(days=1)).strftime("%Y-%m-%d")
+    return (date.fromisoformat(today_str) - timedelta(days=1)).isoformat()
 
 
 class DailyRateLimitCounter:
     DAILY_LIMIT_DEFAULT = 10_000
     TZ_NAME = "America/New_York"
     RETENTION_DAYS = 30
+    FLUSH_EVERY_N = 50
+    FLUSH_INTERVAL_S = 5.0
+    # 2: updated_at_epoch (unix seconds) replaces the ISO updated_at_utc string of unversioned files
+    STATE_VERSION = 2
+
+    __slots__ = (
+        "_state_path",
+        "_state_file",
+        "_tmp_file",
+        "_state_dir",
+        "_daily_limit",
+        "_tz",
+        "_retention_days",
+        "_now",
+        "_lock",
+        "_save_lock",
+        "_save_seq",
+        "_written_seq",
+        "_current_date",
+        "_current_count",
+        "_history",
+        "_flush_every_n",
+        "_flush_interval_s",
+        "_dirty",
+        "_unsaved_updates",
+        "_closed",
+        "_flush_requested",
+        "_background_flush",
+        "_flush_thread",
+        "_pretty",
+        "_history_json",
+        "_date_cache",
+    )
 
     def __init__(
         self,
@@ -35,131 +100,328 @@ class DailyRateLimitCounter:
         tz_name: str = TZ_NAME,
         retention_days: int = RETENTION_DAYS,
         now_func: typing.Callable[[], datetime] | None = None,
+        flush_every_n: int = FLUSH_EVERY_N,
+        flush_interval_s: float = FLUSH_INTERVAL_S,
+        background_flush: bool = True,
+        pretty: bool = False,
     ) -> None:
         self._state_path = Path(state_path) if state_path is not None else Path("var/ratelimit_state.json")
+        # Save paths are fixed, so resolve them once instead of on every write
+        self._state_file = str(self._state_path)
+        self._tmp_file = str(self._state_path.with_suffix(self._state_path.suffix + ".tmp"))
+        self._state_dir = str(self._state_path.parent)
         self._daily_limit = daily_limit
         self._tz = ZoneInfo(tz_name)
         self._retention_days = retention_days
-        self._now = now_func if now_func is not None else (lambda: datetime.now(ZoneInfo("UTC")))
+        self._now = now_func if now_func is not None else (lambda: datetime.now(_UTC))
         self._lock = threading.Lock()
+        # Serializes file writes, which run outside _lock so disk I/O never blocks counter updates
+        self._save_lock = threading.Lock()
+        # Snapshot sequence numbers: a write is skipped if a newer snapshot is already on disk
+        self._save_seq = 0
+        self._written_seq = 0
         self._current_date = ""
         self._current_count = 0
-        self._history: dict[str, int] = {}
+        # (date, count) for past days, oldest first; maxlen evicts beyond the retention window
+        self._history: collections.deque[tuple[str, int]] = collections.deque(maxlen=retention_days)
+        self._flush_every_n = flush_every_n
+        self._flush_interval_s = flush_interval_s
+        self._dirty = False
+        self._unsaved_updates = 0
+        self._closed = threading.Event()
+        # Set by _mark_dirty once flush_every_n updates are pending, to wake the flush thread early
+        self._flush_requested = threading.Event()
+        self._background_flush = background_flush
+        # Indented output is for humans inspecting the file; the default compact output is machine-read only
+        self._pretty = pretty
+        # Compact encoding of the history, which changes only on rollover; None when stale
+        self._history_json: bytes | None = None
+        # (UTC epoch minute, date string): midnight in the target tz always falls on a whole UTC minute
+        self._date_cache: tuple[int, str] = (-1, "")
         self._load_or_init()
+        atexit.register(self.close)
+        self._flush_thread: threading.Thread | None = None
+        if background_flush:
+            self._flush_thread = threading.Thread(target=self._flush_loop, name="ratelimit-flush", daemon=True)
+            self._flush_thread.start()
 
     def _today_str(self) -> str:
-        return _today_est_str(self._tz, self._now())
-
-    def _atomic_write_json(self, path: Path, data: dict) -> None:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        tmp = path.with_suffix(path.suffix + ".tmp")
-        with open(tmp, "w") as f:
-            json.dump(data, f, indent=2)
-            f.flush()
-            os.fsync(f.fileno())
-        os.replace(tmp, path)
-
-    def _serialize_state(self) -> dict:
-        return {
-            "tz": getattr(self._tz, "key", str(self._tz)),
-            "daily_limit": self._daily_limit,
-            "current_date": self._current_date,
-            "current_count": self._current_count,
-            "history": self._history,
-            "updated_at_utc": self._now().isoformat(),
-        }
+        now = self._now()
+        minute = int(now.timestamp()) // 60
+        cached_minute, cached_date = self._date_cache
+        if minute == cached_minute:
+            return cached_date
+        today = _today_est_str(self._tz, now)
+        self._date_cache = (minute, today)
+        return today
+
+    def _atomic_write_json(self, data: bytes) -> None:
+        os.makedirs(self._state_dir, exist_ok=True)
+        payload = memoryview(data)
+        # O_DSYNC makes the write itself durable (data only, like fdatasync) instead of a separate fsync
+        fd = os.open(self._tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | _O_DSYNC, 0o644)
+        try:
+            while payload:
+                payload = payload[os.write(fd, payload) :]
+            if not _O_DSYNC:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(self._tmp_file, self._state_file)
+        _fsync_dir(self._state_dir)
+
+    def _serialize_state(self) -> bytes:
+        tz = getattr(self._tz, "key", str(self._tz))
+        updated_at = int(self._now().timestamp())
+        if self._pretty:
+            state = {
+                "version": self.STATE_VERSION,
+                "tz": tz,
+                "daily_limit": self._daily_limit,
+                "current_date": self._current_date,
+                "current_count": self._current_count,
+                "history": dict(self._history),
+                "updated_at_epoch": updated_at,
+            }
+            return orjson.dumps(state, option=orjson.OPT_INDENT_2)
+        if self._history_json is None:
+            self._history_json = orjson.dumps(dict(self._history))
+        # Same layout orjson.dumps would produce; only the count and timestamp change between rollovers
+        return b'{"version":%d,"tz":%s,"daily_limit":%d,"current_date":"%s","current_count":%d,"history":%s,"updated_at_epoch":%d}' % (
+            self.STATE_VERSION,
+            orjson.dumps(tz),
+            self._daily_limit,
+            self._current_date.encode(),
+            self._current_count,
+            self._history_json,
+            updated_at,
+        )
 
     def _load_or_init(self) -> None:
         if self._state_path.exists():
             try:
-                with open(self._state_path) as f:
-                    data = json.load(f)
+                data = orjson.loads(self._state_path.read_bytes())
+                # A file from another (e.g. newer) version may not mean what this code reads it as
+                version = data["version"] if "version" in data else 1
+                if version not in (1, self.STATE_VERSION):
+                    raise ValueError(f"Unsupported state file version: {version!r}")
+                # Unversioned (v1) and v2 files share these keys; the updated_at field is informational only
                 self._current_date = data["current_date"]
                 self._current_count = int(data["current_count"])
-                self._history = {k: int(v) for k, v in (data.get("history") or {}).items()}
+                self._history.clear()
+                self._history_json = None
+                self._history.extend(sorted((k, int(v)) for k, v in (data.get("history") or {}).items()))
                 self._rollover_if_needed()
                 return
-            except (json.JSONDecodeError, KeyError, TypeError):
-                backup = self._state_path.with_suffix(
-                    self._state_path.suffix + ".corrupt." + self._now().strftime("%Y%m%d%H%M%S")
+            except (ValueError, KeyError, TypeError):
+                # Corrupt (orjson.JSONDecodeError is a ValueError) or unsupported file. pid + monotonic_ns keep
+                # backups from rapid or concurrent restarts from colliding.
+                backup = "%s.corrupt.%s.%d.%d" % (
+                    self._state_file,
+                    self._now().strftime("%Y%m%d%H%M%S"),
+                    os.getpid(),
+                    time.monotonic_ns(),
                 )
-                self._state_path.rename(backup)
+                # Hard-link first so the corrupt file stays readable at its path until the backup exists
+                try:
+                    os.link(self._state_file, backup)
+                    os.unlink(self._state_file)
+                except OSError:
+                    # no hard links on this filesystem; may also fail if another process already moved it
+                    try:
+                        os.replace(self._state_file, backup)
+                    except FileNotFoundError:
+                        pass
         today = self._today_str()
         self._current_date = today
         self._current_count = 0
-        self._history = {}
+        self._history.clear()
+        self._history_json = None
         self._save()
 
+    def _take_snapshot(self) -> tuple[int, bytes]:
+        """Serialize the state for saving (lock held) and mark it clean."""
+        self._save_seq += 1
+        self._dirty = False
+        self._unsaved_updates = 0
+        return self._save_seq, self._serialize_state()
+
+    def _write_snapshot(self, seq: int, data: bytes) -> None:
+        with self._save_lock:
+            if seq <= self._written_seq:
+                return
+            self._atomic_write_json(data)
+            self._written_seq = seq
+
     def _save(self) -> None:
-        self._atomic_write_json(self._state_path, self._serialize_state())
+        """Save inline (lock held). Only used at startup and when there is no background flush thread."""
+        seq, data = self._take_snapshot()
+        try:
+            self._write_snapshot(seq, data)
+        except OSError:
+            self._dirty = True
+            raise
+
+    def _save_outside_lock(self, snapshot: tuple[int, bytes]) -> None:
+        try:
+            self._write_snapshot(*snapshot)
+        except OSError:
+            # Keep the state dirty so the next flush retries
+            with self._lock:
+                self._dirty = True
+            raise
+
+    def _mark_dirty(self) -> None:
+        """Note an in-memory update (lock held). Once flush_every_n updates are pending the flush thread is
+        woken; the save itself only runs inline when there is no background thread."""
+        self._dirty = True
+        self._unsaved_updates += 1
+        if self._unsaved_updates >= self._flush_every_n:
+            if self._background_flush:
+                self._flush_requested.set()
+            else:
+                self._save()
+
+    def _flush_loop(self) -> None:
+        while not self._closed.is_set():
+            self._flush_requested.wait(self._flush_interval_s)
+            self._flush_requested.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Keep the thread alive whatever went wrong; otherwise nothing is saved for the rest of the process
+                logger.exception("Could not save rate-limit state to %s; retrying", self._state_file)
 
     def _rollover_if_needed(self) -> None:
         today = self._today_str()
         if today == self._current_date:
             return
-        self._history[self._current_date] = self._current_count
-        self._current_date = today
+        self._history.append((self._current_date, self._current_count))
+        self._history_json = None
+        # Reset before publishing the new date: lock-free readers load the date first, then the count
         self._current_count = 0
-        if self._history:
-            sorted_dates = sorted(self._history.keys(), reverse=True)
-            if len(sorted_dates) > self._retention_days:
-                for d in sorted_dates[self._retention_days :]:
-                    del self._history[d]
-        self._save()
+        self._current_date = today
+        if self._background_flush:
+            self._dirty = True
+            self._flush_requested.set()
+        else:
+            self._save()
 
     def try_consume(self, n: int = 1) -> tuple[bool, int]:
         """If adding n would exceed daily limit, return (False, current_count). Else add and return (True, new_count)."""
-        if not isinstance(n, int) or n <= 0:
+        if type(n) is not int or n <= 0:
             raise ValueError("n must be a positive integer")
         with self._lock:
             self._rollover_if_needed()
             if self._current_count + n > self._daily_limit:
                 return (False, self._current_count)
             self._current_count += n
-            self._save()
+            self._mark_dirty()
             return (True, self._current_count)
 
-    def can_consume(self, n: int = 1) -> bool:
-        """True if n more hits would not exceed the daily limit (after rollover)."""
+    def try_reserve(self, n: int) -> str | None:
+        """try_consume(n) that returns the date the hits were counted against, or None if they do not fit.
+        Pass the date to adjust() so a reservation made before a rollover is not settled against the new day."""
+        if type(n) is not int or n <= 0:
+            raise ValueError("n must be a positive integer")
         with self._lock:
             self._rollover_if_needed()
-            return self._current_count + n <= self._daily_limit
+            if self._current_count + n > self._daily_limit:
+                return None
+            self._current_count += n
+            self._mark_dirty()
+            return self._current_date
+
+    def _read_current(self) -> tuple[str, int]:
+        """(current_date, count) for status reads. Lock-free unless a rollover is due: single attribute reads
+        are atomic, and readers only ever lag a concurrent writer by that writer's own update."""
+        current_date = self._current_date
+        count = self._current_count
+        if self._today_str() == current_date:
+            return current_date, count
+        with self._lock:
+            self._rollover_if_needed()
+            return self._current_date, self._current_count
+
+    def _read_count(self) -> int:
+        return self._read_current()[1]
+
+    def can_consume(self, n: int = 1) -> bool:
+        """True if n more hits would not exceed the daily limit (after rollover)."""
+        return self._read_count() + n <= self._daily_limit
 
     def record_usage(self, n: int) -> None:
-        """Record n hits after a request (e.g. after BLP returns). May push count over daily_limit."""
-        if not isinstance(n, int) or n < 0:
+        """Record n hits after a request (e.g. after BLP returns). May push count over daily_limit.
+        Persisted by the write-behind flush."""
+        if type(n) is not int or n < 0:
             raise ValueError("n must be a non-negative integer")
         if n == 0:
             return
         with self._lock:
             self._rollover_if_needed()
             self._current_count += n
-            self._save()
+            self._mark_dirty()
 
-    def get_count(self) -> int:
+    def adjust(self, delta: int, date_str: str | None = None) -> None:
+        """Correct an earlier try_consume() estimate by delta hits once the real count is known.
+        Negative delta releases unused hits; today's count never drops below 0. If date_str (from try_reserve())
+        is no longer the current day, the reservation belonged to a past day and nothing is changed."""
+        if type(delta) is not int:
+            raise ValueError("delta must be an integer")
+        if delta == 0:
+            return
         with self._lock:
             self._rollover_if_needed()
-            return self._current_count
+            if date_str is not None and date_str != self._current_date:
+                return
+            self._current_count = max(0, self._current_count + delta)
+            self._mark_dirty()
+
+    def _history_get(self, date_str: str) -> int | None:
+        # Newest first: yesterday is the last entry unless the process was down that day. Scans a copy
+        # (taken atomically in C) since a rollover on another thread may append while this runs unlocked.
+        for d, count in reversed(tuple(self._history)):
+            if d == date_str:
+                return count
+        return None
+
+    def get_count(self) -> int:
+        return self._read_count()
 
     def remaining(self) -> int:
-        with self._lock:
-            self._rollover_if_needed()
-            return max(0, self._daily_limit - self._current_count)
+        return max(0, self._daily_limit - self._read_count())
 
     def get_usage(self, date_str: str) -> int | None:
-        with self._lock:
-            self._rollover_if_needed()
-            if date_str == self._current_date:
-                return self._current_count
-            return self._history.get(date_str)
+        current_date, count = self._read_current()
+        if date_str == current_date:
+            return count
+        return self._history_get(date_str)
 
     def get_yesterday_usage(self) -> int | None:
+        current_date, _ = self._read_current()
+        return self._history_get(_yesterday_est_str(current_date))
+
+    def flush(self) -> None:
+        """Write state to disk if anything changed since the last save."""
         with self._lock:
             self._rollover_if_needed()
-            yesterday = _yesterday_est_str(self._current_date)
-            return self._history.get(yesterday)
+            if not self._dirty:
+                return
+            snapshot = self._take_snapshot()
+        self._save_outside_lock(snapshot)
 
     def force_save(self) -> None:
         with self._lock:
             self._rollover_if_needed()
-            self._save()
+            snapshot = self._take_snapshot()
+        self._save_outside_lock(snapshot)
+
+    def close(self) -> None:
+        """Stop the background flush thread and write any pending usage."""
+        atexit.unregister(self.close)
+        self._closed.set()
+        self._flush_requested.set()
+        thread = self._flush_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
@@ -1,30 +1,34 @@
 
-import collections
 import json
 import enum
 import typing
 
 
-class Transport(enum.Enum):
+class Transport(str, enum.Enum):
   STDIO = "stdio"
   SSE = "sse"
   STREAMABLE_HTTP = "streamable-http"
 
 class StartupArgs:
+  __slots__ = ("transport", "host", "port", "enable_rate_limit")
+
   transport: Transport
   host: str
   port: int
+  enable_rate_limit: bool
 
-  def __init__(self, transport: Transport, host: str, port: int) -> None:
+  def __init__(self, transport: Transport, host: str, port: int, enable_rate_limit: bool = True) -> None:
     self.transport = transport
     self.host = host
     self.port = port
+    self.enable_rate_limit = enable_rate_limit
 
   def __str__(self) -> str:
     return json.dumps({
-      "transport": self.transport.value,
+      "transport": self.transport,
       "host": self.host,
       "port": self.port,
+      "enable_rate_limit": self.enable_rate_limit,
     })
 
 BloombergKWArgs = typing.Union[None, typing.Dict[str, typing.Any]]